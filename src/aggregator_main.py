@@ -4,10 +4,10 @@ import logging
 import signal
 import sys
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Response
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 import uvicorn
-from multi_cluster_aggregator import MultiClusterMetricsAggregator
+from multi_cluster_aggregator import MultiClusterMetricsAggregator, DEFAULT_MAX_CONCURRENT_CLUSTERS
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +20,19 @@ logger = logging.getLogger(__name__)
 aggregator = None
 collection_task = None
 
+# Rendered /metrics payload, plain and gzipped, refreshed after every aggregation
+_cached_metrics: bytes = b""
+_cached_metrics_gzip: bytes = b""
+_cache_lock = asyncio.Lock()
+
+
+async def refresh_cached_metrics():
+    """Render the current metrics once so scrapes can serve them as-is."""
+    global _cached_metrics, _cached_metrics_gzip
+    async with _cache_lock:
+        _cached_metrics = aggregator.get_aggregated_metrics()
+        _cached_metrics_gzip = aggregator.get_aggregated_metrics_gzip()
+
 
 async def aggregate_metrics_periodically(interval: int):
     """Background task to aggregate metrics from all clusters periodically."""
@@ -28,6 +41,7 @@ async def aggregate_metrics_periodically(interval: int):
             await asyncio.sleep(interval)
             logger.info("Performing periodic metrics aggregation...")
             await aggregator.aggregate_all_metrics()
+            await refresh_cached_metrics()
             logger.info("Periodic aggregation completed")
         except asyncio.CancelledError:
             logger.info("Metrics aggregation task cancelled")
@@ -46,16 +60,25 @@ async def lifespan(app: FastAPI):
     
     # Configuration from environment variables
     collection_interval = int(os.environ.get('COLLECTION_INTERVAL', '60'))
+    max_concurrent_clusters = int(os.environ.get('MAX_CONCURRENT_CLUSTERS', DEFAULT_MAX_CONCURRENT_CLUSTERS))
+    if max_concurrent_clusters < 1:
+        # A semaphore of 0 never lets a fetch through, which would hang startup
+        logger.warning(f"MAX_CONCURRENT_CLUSTERS must be at least 1, got {max_concurrent_clusters}; using 1")
+        max_concurrent_clusters = 1
     
-    logger.info(f"Collection Interval: {collection_interval}s")
+    logger.info(f"Collection Interval: {collection_interval}s, Max Concurrent Clusters: {max_concurrent_clusters}")
     
     # Initialize aggregator
     try:
-        aggregator = MultiClusterMetricsAggregator()
+        aggregator = MultiClusterMetricsAggregator(
+            semaphore=asyncio.Semaphore(max_concurrent_clusters)
+        )
+        await aggregator.start()
         
         # Initial collection
         logger.info("Performing initial metrics aggregation...")
         await aggregator.aggregate_all_metrics()
+        await refresh_cached_metrics()
         logger.info("Initial aggregation completed successfully")
         
         # Start background collection task
@@ -77,6 +100,8 @@ async def lifespan(app: FastAPI):
             await collection_task
         except asyncio.CancelledError:
             pass
+    if aggregator:
+        await aggregator.close()
 
 
 # Create FastAPI app with lifespan manager
@@ -84,18 +109,27 @@ app = FastAPI(
     title="Multi-Cluster MCE Metrics Aggregator",
     description="Prometheus aggregator for multiple OpenShift MCE cluster metrics",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
 @app.get("/metrics", response_class=PlainTextResponse)
-async def metrics():
+async def metrics(request: Request):
     """Endpoint for Prometheus to scrape aggregated metrics from all clusters."""
     try:
         if aggregator:
+            # The payload is compressed once per aggregation, not per scrape
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                return Response(
+                    content=_cached_metrics_gzip,
+                    media_type="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+                )
             return Response(
-                content=aggregator.get_aggregated_metrics(),
-                media_type="text/plain; version=0.0.4; charset=utf-8"
+                content=_cached_metrics,
+                media_type="text/plain; version=0.0.4; charset=utf-8",
+                headers={"Vary": "Accept-Encoding"}
             )
         else:
             return Response(
@@ -110,22 +144,21 @@ async def metrics():
         )
 
 
+# Probe responses never change, so build them once and reuse them
+_OK = PlainTextResponse("OK")
+_NOT_READY = PlainTextResponse("Not Ready", status_code=503)
+
+
 @app.get("/health", response_class=PlainTextResponse)
 async def health():
     """Health check endpoint."""
-    if aggregator:
-        return "OK"
-    else:
-        return Response(content="Not Ready", status_code=503)
+    return _OK if aggregator else _NOT_READY
 
 
 @app.get("/ready", response_class=PlainTextResponse)
 async def ready():
     """Readiness check endpoint."""
-    if aggregator:
-        return "OK"
-    else:
-        return Response(content="Not Ready", status_code=503)
+    return _OK if aggregator else _NOT_READY
 
 
 @app.get("/clusters")
@@ -166,11 +199,17 @@ def main():
     port = int(os.environ.get('METRICS_PORT', '8080'))
     host = os.environ.get('METRICS_HOST', '0.0.0.0')
     
+    # Use uvloop/httptools where available (not supported on Windows)
+    server_options = {}
+    if sys.platform != 'win32':
+        server_options = {'loop': 'uvloop', 'http': 'httptools'}
+    
     # Run the FastAPI app with uvicorn
     uvicorn.run(
         app,
         host=host,
         port=port,
+        **server_options,
         log_config={
             "version": 1,
             "disable_existing_loggers": False,
@@ -1,62 +1,203 @@
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import sys
+from collections import defaultdict
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import orjson
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 import requests
+import urllib3
 from models import (
     Host, InfraEnv, ClusterDeployment, ManagedCluster, 
     MetricsData, HostStatus
 )
+from resource_cache import ResourceCache, list_custom_objects
 
 logger = logging.getLogger(__name__)
 
+# Label linking an Agent to the InfraEnv it was discovered through
+INFRAENV_LABEL = 'infraenvs.agent-install.openshift.io'
+
+# Connections kept per API server host by the Kubernetes client
+CONNECTION_POOL_MAXSIZE = 64
+
+# Custom resources read by the collector, as LIST arguments keyed by plural
+RESOURCES = {
+    'infraenvs': {
+        'group': "agent-install.openshift.io",
+        'version': "v1beta1",
+        'plural': "infraenvs"
+    },
+    # Only agents bound to an InfraEnv are returned by the API server
+    'agents': {
+        'group': "agent-install.openshift.io",
+        'version': "v1beta1",
+        'plural': "agents",
+        'label_selector': INFRAENV_LABEL
+    },
+    'clusterdeployments': {
+        'group': "hive.openshift.io",
+        'version': "v1",
+        'plural': "clusterdeployments"
+    },
+    'managedclusters': {
+        'group': "cluster.open-cluster-management.io",
+        'version': "v1",
+        'plural': "managedclusters"
+    },
+}
+
+
+def _dig(d: Any, *keys: str, default: Any = None) -> Any:
+    """Walk nested dicts by key, returning default on the first miss."""
+    for key in keys:
+        if not isinstance(d, dict):
+            return default
+        d = d.get(key)
+        if d is None:
+            return default
+    return d
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a short categorical value that repeats across many resources."""
+    return sys.intern(value) if value else value
+
+
+def _bytes_to_mb(bytes_value: Optional[int]) -> Optional[int]:
+    """Convert bytes to megabytes."""
+    if bytes_value is None:
+        return None
+    return bytes_value >> 20
+
+
+def _calculate_total_disk_gb(disks: List[Dict[str, Any]]) -> Optional[int]:
+    """Calculate total disk space in GB from disk list."""
+    if not disks:
+        return None
+    
+    # Skip missing and zero-sized entries rather than adding a 0 fallback
+    total_bytes = 0
+    for disk in disks:
+        size = disk.get('sizeBytes')
+        if size:
+            total_bytes += size
+    return total_bytes >> 30
+
+
+def _agent_to_host(agent: Dict[str, Any]) -> Host:
+    """Build a Host from an Agent resource."""
+    status = agent.get('status') or {}
+    inventory = status.get('inventory') or {}
+    inventory_get = inventory.get
+    
+    return Host(
+        id=_dig(agent, 'metadata', 'name'),
+        hostname=inventory_get('hostname'),
+        status=HostStatus(_dig(status, 'debugInfo', 'state', default=HostStatus.DISCOVERING)),
+        status_info=_dig(status, 'debugInfo', 'stateInfo'),
+        cpu_cores=_dig(inventory, 'cpu', 'count'),
+        memory_mb=_bytes_to_mb(_dig(inventory, 'memory', 'physicalBytes')),
+        disk_gb=_calculate_total_disk_gb(inventory_get('disks')),
+        architecture=_intern(_dig(inventory, 'cpu', 'architecture')),
+        vendor=_intern(_dig(inventory, 'systemVendor', 'manufacturer')),
+        model=_intern(_dig(inventory, 'systemVendor', 'productName')),
+        cluster_id=_dig(agent, 'spec', 'clusterDeploymentName', 'name')
+    )
+
 
 class OpenShiftMetricsCollector:
-    def __init__(self, in_cluster: bool = True):
+    def __init__(self, in_cluster: bool = True, use_watch: bool = False):
         """Initialize the OpenShift metrics collector.
         
         Args:
             in_cluster: Whether running inside the cluster or not
+            use_watch: Serve collections from watch-backed caches instead of
+                listing every resource on each collection
         """
         if in_cluster:
             config.load_incluster_config()
         else:
             config.load_kube_config()
         
-        self.api = client.ApiClient()
+        # Size the connection pool for concurrent collectors and long-lived
+        # watches, and back off between retries instead of retrying in a tight loop
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
+        configuration.retries = urllib3.Retry(total=3, backoff_factor=0.2)
+        
+        self.api = client.ApiClient(configuration)
         self.custom_api = client.CustomObjectsApi(self.api)
         self.core_api = client.CoreV1Api(self.api)
         
+        # Last seen resourceVersion per resource, and digest of the last collection
+        self.resource_versions: Dict[str, Optional[str]] = {}
+        self.metrics_digest: Optional[bytes] = None
+        self.metrics_changed = True
+        
+        self.caches: Dict[str, ResourceCache] = {}
+        if use_watch:
+            self.caches = {
+                plural: ResourceCache(self.custom_api, **list_kwargs)
+                for plural, list_kwargs in RESOURCES.items()
+            }
+    
+    def start_watches(self):
+        """Start the background watches feeding the resource caches."""
+        for cache in self.caches.values():
+            cache.start()
+    
+    def stop_watches(self):
+        """Stop the background watches."""
+        for cache in self.caches.values():
+            cache.stop()
+    
+    def _list_items(self, plural: str) -> List[Dict[str, Any]]:
+        """List a custom resource, from its watch cache once that has synced."""
+        cache = self.caches.get(plural)
+        if cache and cache.has_synced():
+            return cache.list_items()
+        
+        # Once we have seen a resourceVersion, let the API server answer from its
+        # watch cache instead of doing a quorum read against etcd
+        list_kwargs = dict(RESOURCES[plural])
+        resource_version = self.resource_versions.get(plural)
+        if resource_version:
+            list_kwargs['resource_version'] = resource_version
+            list_kwargs['resource_version_match'] = 'NotOlderThan'
+        
+        result = list_custom_objects(self.custom_api, **list_kwargs)
+        self.resource_versions[plural] = result.get('metadata', {}).get('resourceVersion')
+        return result.get('items', [])
+        
     def collect_infra_envs(self) -> List[InfraEnv]:
         """Collect all InfraEnv resources and their associated hosts."""
         infra_envs = []
         
         try:
             # Get all InfraEnvs across all namespaces
-            infra_env_list = self.custom_api.list_cluster_custom_object(
-                group="agent-install.openshift.io",
-                version="v1beta1",
-                plural="infraenvs"
-            )
+            infra_env_items = self._list_items('infraenvs')
             
-            for item in infra_env_list.get('items', []):
+            # Get all agents in a single call and group them by InfraEnv
+            agent_index = self._list_all_agents()
+            
+            for item in infra_env_items:
                 metadata = item.get('metadata', {})
-                spec = item.get('spec', {})
-                status = item.get('status', {})
                 
+                # Namespaces are shared by many objects and end up in every label set
                 infra_env = InfraEnv(
                     name=metadata.get('name'),
-                    namespace=metadata.get('namespace'),
+                    namespace=_intern(metadata.get('namespace')),
                     uid=metadata.get('uid'),
-                    created_at=metadata.get('creationTimestamp')
+                    created_at=self._parse_timestamp(metadata.get('creationTimestamp'))
                 )
                 
-                # Collect hosts for this InfraEnv
-                hosts = self._collect_hosts_for_infra_env(
-                    infra_env.name, 
-                    infra_env.namespace
-                )
-                infra_env.hosts = hosts
+                # Attach hosts belonging to this InfraEnv
+                infra_env.hosts = agent_index.get((infra_env.namespace, infra_env.name), [])
                 
                 infra_envs.append(infra_env)
                 
@@ -65,78 +206,48 @@ class OpenShiftMetricsCollector:
             
         return infra_envs
     
-    def _collect_hosts_for_infra_env(self, infra_env_name: str, namespace: str) -> List[Host]:
-        """Collect all Agent (host) resources for a specific InfraEnv."""
-        hosts = []
+    def _list_all_agents(self) -> Dict[Tuple[str, str], List[Host]]:
+        """Collect all Agent (host) resources, keyed by (namespace, InfraEnv name)."""
+        agent_index = defaultdict(list)
         
         try:
-            # Get agents in the namespace
-            agents = self.custom_api.list_namespaced_custom_object(
-                group="agent-install.openshift.io",
-                version="v1beta1",
-                namespace=namespace,
-                plural="agents"
-            )
+            agent_items = self._list_items('agents')
             
-            for agent in agents.get('items', []):
+            for agent in agent_items:
                 metadata = agent.get('metadata', {})
-                spec = agent.get('spec', {})
-                status = agent.get('status', {})
-                
-                # Check if this agent belongs to the InfraEnv
-                labels = metadata.get('labels', {})
-                if labels.get('infraenvs.agent-install.openshift.io') != infra_env_name:
-                    continue
-                
-                inventory = status.get('inventory', {})
                 
-                # Extract host information
-                host = Host(
-                    id=metadata.get('name'),
-                    hostname=inventory.get('hostname'),
-                    status=status.get('debugInfo', {}).get('state', HostStatus.DISCOVERING),
-                    status_info=status.get('debugInfo', {}).get('stateInfo'),
-                    cpu_cores=inventory.get('cpu', {}).get('count'),
-                    memory_mb=self._bytes_to_mb(inventory.get('memory', {}).get('physicalBytes')),
-                    disk_gb=self._calculate_total_disk_gb(inventory.get('disks', [])),
-                    architecture=inventory.get('cpu', {}).get('architecture'),
-                    vendor=inventory.get('systemVendor', {}).get('manufacturer'),
-                    model=inventory.get('systemVendor', {}).get('productName'),
-                    cluster_id=spec.get('clusterDeploymentName', {}).get('name')
+                # Group the agent under the InfraEnv it belongs to
+                infra_env_name = metadata.get('labels', {}).get(INFRAENV_LABEL)
+                agent_index[(metadata.get('namespace'), infra_env_name)].append(
+                    _agent_to_host(agent)
                 )
                 
-                hosts.append(host)
-                
         except ApiException as e:
-            logger.error(f"Error collecting hosts for InfraEnv {infra_env_name}: {e}")
+            logger.error(f"Error collecting Agents: {e}")
             
-        return hosts
+        return agent_index
     
     def collect_cluster_deployments(self) -> List[ClusterDeployment]:
         """Collect all ClusterDeployment resources."""
         cluster_deployments = []
         
         try:
-            cd_list = self.custom_api.list_cluster_custom_object(
-                group="hive.openshift.io",
-                version="v1",
-                plural="clusterdeployments"
-            )
+            cd_items = self._list_items('clusterdeployments')
             
-            for item in cd_list.get('items', []):
+            for item in cd_items:
                 metadata = item.get('metadata', {})
                 spec = item.get('spec', {})
                 status = item.get('status', {})
                 
                 cd = ClusterDeployment(
                     name=metadata.get('name'),
-                    namespace=metadata.get('namespace'),
+                    namespace=_intern(metadata.get('namespace')),
                     uid=metadata.get('uid'),
-                    status=status.get('conditions', [{}])[0].get('type') if status.get('conditions') else None,
+                    status=_intern(status['conditions'][0].get('type')) if status.get('conditions') else None,
                     base_domain=spec.get('baseDomain'),
                     cluster_name=spec.get('clusterName'),
-                    platform=spec.get('platform', {}).get('type'),
-                    agent_cluster_install_ref=spec.get('clusterInstallRef', {}).get('name')
+                    platform=_intern(_dig(spec, 'platform', 'type')),
+                    agent_cluster_install_ref=_dig(spec, 'clusterInstallRef', 'name')
                 )
                 
                 cluster_deployments.append(cd)
@@ -151,13 +262,9 @@ class OpenShiftMetricsCollector:
         managed_clusters = []
         
         try:
-            mc_list = self.custom_api.list_cluster_custom_object(
-                group="cluster.open-cluster-management.io",
-                version="v1",
-                plural="managedclusters"
-            )
+            mc_items = self._list_items('managedclusters')
             
-            for item in mc_list.get('items', []):
+            for item in mc_items:
                 metadata = item.get('metadata', {})
                 status = item.get('status', {})
                 
@@ -170,9 +277,9 @@ class OpenShiftMetricsCollector:
                     uid=metadata.get('uid'),
                     status=status,
                     cluster_id=labels.get('clusterID'),
-                    vendor=labels.get('vendor'),
-                    cloud=labels.get('cloud'),
-                    version=status.get('version', {}).get('kubernetes'),
+                    vendor=_intern(labels.get('vendor')),
+                    cloud=_intern(labels.get('cloud')),
+                    version=_intern(_dig(status, 'version', 'kubernetes')),
                     cpu_cores=self._extract_cluster_capacity(item, 'cpu'),
                     memory_gb=self._extract_cluster_capacity(item, 'memory'),
                     node_count=self._extract_node_count(item)
@@ -203,24 +310,54 @@ class OpenShiftMetricsCollector:
         logger.info("Collecting ManagedClusters...")
         metrics.managed_clusters = self.collect_managed_clusters()
         
+        self._update_digest(metrics)
         logger.info("Metrics collection completed")
         return metrics
     
-    @staticmethod
-    def _bytes_to_mb(bytes_value: Optional[int]) -> Optional[int]:
-        """Convert bytes to megabytes."""
-        if bytes_value is None:
-            return None
-        return int(bytes_value / (1024 * 1024))
+    async def collect_all_metrics_async(self, executor: Optional[Executor] = None) -> MetricsData:
+        """Collect all metrics from the cluster, running the collectors concurrently.
+        
+        Args:
+            executor: Executor for the blocking API calls, the loop's default if None
+        """
+        logger.info("Starting concurrent metrics collection...")
+        
+        # The Kubernetes client is blocking, so run each collector in the executor
+        loop = asyncio.get_running_loop()
+        infra_envs, cluster_deployments, managed_clusters = await asyncio.gather(
+            loop.run_in_executor(executor, self.collect_infra_envs),
+            loop.run_in_executor(executor, self.collect_cluster_deployments),
+            loop.run_in_executor(executor, self.collect_managed_clusters)
+        )
+        
+        metrics = MetricsData(
+            infra_envs=infra_envs,
+            cluster_deployments=cluster_deployments,
+            managed_clusters=managed_clusters
+        )
+        
+        self._update_digest(metrics)
+        logger.info("Metrics collection completed")
+        return metrics
+    
+    def _update_digest(self, metrics: MetricsData):
+        """Record whether the collected data differs from the previous collection."""
+        # The collection timestamp changes every run, so leave it out of the digest
+        digest = hashlib.blake2b(orjson.dumps([
+            metrics.infra_envs,
+            metrics.cluster_deployments,
+            metrics.managed_clusters
+        ])).digest()
+        
+        self.metrics_changed = digest != self.metrics_digest
+        self.metrics_digest = digest
     
     @staticmethod
-    def _calculate_total_disk_gb(disks: List[Dict[str, Any]]) -> Optional[int]:
-        """Calculate total disk space in GB from disk list."""
-        if not disks:
+    def _parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+        """Parse a Kubernetes RFC 3339 timestamp."""
+        if not timestamp:
             return None
-        
-        total_bytes = sum(disk.get('sizeBytes', 0) for disk in disks)
-        return int(total_bytes / (1024 * 1024 * 1024))
+        return datetime.fromisoformat(timestamp)
     
     def _extract_cluster_capacity(self, managed_cluster: Dict[str, Any], resource: str) -> int:
         """Extract cluster capacity for CPU or memory."""
@@ -3,10 +3,14 @@ import asyncio
 import logging
 import signal
 import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Response
-from fastapi.responses import PlainTextResponse
+from typing import Dict
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 import uvicorn
+from prometheus_client.exposition import choose_encoder
 from collector import OpenShiftMetricsCollector
 from prometheus_exporter import PrometheusMetricsExporter
 
@@ -21,14 +25,37 @@ logger = logging.getLogger(__name__)
 exporter = None
 collection_task = None
 
+# Rendered /metrics payloads keyed by content type, reset after every collection
+_cached_metrics: Dict[str, bytes] = {}
+_cache_lock = asyncio.Lock()
 
-async def collect_metrics_periodically(interval: int):
+
+async def refresh_cached_metrics(executor: Executor):
+    """Render the current metrics once so scrapes can serve them as-is."""
+    global _cached_metrics
+    async with _cache_lock:
+        # Pre-render the classic text format; other formats render on first request.
+        # Rendering is CPU-bound, so it runs in the executor and scrapes keep being
+        # answered from the previous payload until the new one is swapped in.
+        # Keyed by what choose_encoder() hands the handler for a plain scrape, so
+        # the lookup hits whatever version string this prometheus_client uses.
+        encoder, content_type = choose_encoder("")
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(executor, exporter.generate_metrics, encoder)
+        _cached_metrics = {content_type: payload}
+
+
+async def collect_metrics_periodically(interval: int, executor: Executor):
     """Background task to collect metrics periodically."""
     while True:
         try:
             await asyncio.sleep(interval)
             logger.info("Performing periodic metrics collection...")
-            exporter.collect_and_update()
+            try:
+                await exporter.collect_and_update_async(executor)
+            finally:
+                # Refresh on failure too so the error counter gets published
+                await refresh_cached_metrics(executor)
             logger.info("Periodic collection completed")
         except asyncio.CancelledError:
             logger.info("Metrics collection task cancelled")
@@ -48,22 +75,28 @@ async def lifespan(app: FastAPI):
     # Configuration from environment variables
     collection_interval = int(os.environ.get('COLLECTION_INTERVAL', '60'))
     in_cluster = os.environ.get('IN_CLUSTER', 'true').lower() == 'true'
+    use_watch = os.environ.get('USE_WATCH_CACHE', 'true').lower() == 'true'
     
-    logger.info(f"Collection Interval: {collection_interval}s, In Cluster: {in_cluster}")
+    # Dedicated pool for the blocking Kubernetes calls, kept off the event loop
+    app.state.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="collector")
+    
+    logger.info(f"Collection Interval: {collection_interval}s, In Cluster: {in_cluster}, Watch Cache: {use_watch}")
     
     # Initialize collector and exporter
     try:
-        collector = OpenShiftMetricsCollector(in_cluster=in_cluster)
+        collector = OpenShiftMetricsCollector(in_cluster=in_cluster, use_watch=use_watch)
+        collector.start_watches()
         exporter = PrometheusMetricsExporter(collector)
         
         # Initial collection
         logger.info("Performing initial metrics collection...")
-        exporter.collect_and_update()
+        await exporter.collect_and_update_async(app.state.executor)
+        await refresh_cached_metrics(app.state.executor)
         logger.info("Initial collection completed successfully")
         
         # Start background collection task
         collection_task = asyncio.create_task(
-            collect_metrics_periodically(collection_interval)
+            collect_metrics_periodically(collection_interval, app.state.executor)
         )
         
     except Exception as e:
@@ -74,12 +107,15 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down OpenShift MCE Metrics Exporter...")
+    if exporter:
+        exporter.collector.stop_watches()
     if collection_task:
         collection_task.cancel()
         try:
             await collection_task
         except asyncio.CancelledError:
             pass
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
 
 
 # Create FastAPI app with lifespan manager
@@ -87,18 +123,30 @@ app = FastAPI(
     title="OpenShift MCE Metrics Exporter",
     description="Prometheus exporter for OpenShift MCE infrastructure metrics",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Compress large responses (mainly /metrics) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 @app.get("/metrics", response_class=PlainTextResponse)
-async def metrics():
+async def metrics(request: Request):
     """Endpoint for Prometheus to scrape metrics."""
     try:
         if exporter:
+            # Serve OpenMetrics to scrapers that ask for it, classic text otherwise
+            encoder, content_type = choose_encoder(request.headers.get("accept", ""))
+            cached = _cached_metrics
+            payload = cached.get(content_type)
+            if payload is None:
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(request.app.state.executor, exporter.generate_metrics, encoder)
+                cached[content_type] = payload
             return Response(
-                content=exporter.generate_metrics(),
-                media_type="text/plain; version=0.0.4; charset=utf-8"
+                content=payload,
+                media_type=content_type
             )
         else:
             return Response(
@@ -113,22 +161,21 @@ async def metrics():
         )
 
 
+# Probe responses never change, so build them once and reuse them
+_OK = PlainTextResponse("OK")
+_NOT_READY = PlainTextResponse("Not Ready", status_code=503)
+
+
 @app.get("/health", response_class=PlainTextResponse)
 async def health():
     """Health check endpoint."""
-    if exporter:
-        return "OK"
-    else:
-        return Response(content="Not Ready", status_code=503)
+    return _OK if exporter else _NOT_READY
 
 
 @app.get("/ready", response_class=PlainTextResponse)
 async def ready():
     """Readiness check endpoint."""
-    if exporter:
-        return "OK"
-    else:
-        return Response(content="Not Ready", status_code=503)
+    return _OK if exporter else _NOT_READY
 
 
 @app.get("/")
@@ -159,11 +206,17 @@ def main():
     port = int(os.environ.get('METRICS_PORT', '8080'))
     host = os.environ.get('METRICS_HOST', '0.0.0.0')
     
+    # Use uvloop/httptools where available (not supported on Windows)
+    server_options = {}
+    if sys.platform != 'win32':
+        server_options = {'loop': 'uvloop', 'http': 'httptools'}
+    
     # Run the FastAPI app with uvicorn
     uvicorn.run(
         app,
         host=host,
         port=port,
+        **server_options,
         log_config={
             "version": 1,
             "disable_existing_loggers": False,
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+import time
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -24,67 +25,61 @@ class HostStatus(str, Enum):
     ADDED_TO_EXISTING_CLUSTER = "added-to-existing-cluster"
 
 
-class Host(BaseModel):
+@dataclass(slots=True)
+class Host:
     id: str
-    hostname: Optional[str] = None
     status: HostStatus
+    hostname: Optional[str] = None
     status_info: Optional[str] = None
-    cpu_cores: Optional[int] = Field(None, alias="cpuCores")
-    memory_mb: Optional[int] = Field(None, alias="memoryMB")
-    disk_gb: Optional[int] = Field(None, alias="diskGB")
+    cpu_cores: Optional[int] = None
+    memory_mb: Optional[int] = None
+    disk_gb: Optional[int] = None
     architecture: Optional[str] = None
     vendor: Optional[str] = None
     model: Optional[str] = None
-    cluster_id: Optional[str] = Field(None, alias="clusterId")
-    
-    class Config:
-        populate_by_name = True
+    cluster_id: Optional[str] = None
 
 
-class InfraEnv(BaseModel):
+@dataclass(slots=True)
+class InfraEnv:
     name: str
     namespace: str
     uid: str
-    hosts: List[Host] = []
-    created_at: Optional[datetime] = Field(None, alias="createdAt")
-    
-    class Config:
-        populate_by_name = True
+    hosts: List[Host] = field(default_factory=list)
+    created_at: Optional[datetime] = None
 
 
-class ClusterDeployment(BaseModel):
+@dataclass(slots=True)
+class ClusterDeployment:
     name: str
     namespace: str
     uid: str
     status: Optional[str] = None
-    base_domain: Optional[str] = Field(None, alias="baseDomain")
-    cluster_name: Optional[str] = Field(None, alias="clusterName")
+    base_domain: Optional[str] = None
+    cluster_name: Optional[str] = None
     platform: Optional[str] = None
-    agent_cluster_install_ref: Optional[str] = Field(None, alias="agentClusterInstallRef")
-    
-    class Config:
-        populate_by_name = True
+    agent_cluster_install_ref: Optional[str] = None
 
 
-class ManagedCluster(BaseModel):
+@dataclass(slots=True)
+class ManagedCluster:
     name: str
-    namespace: Optional[str] = None
     uid: str
+    namespace: Optional[str] = None
     status: Optional[Dict[str, Any]] = None
-    cluster_id: Optional[str] = Field(None, alias="clusterId")
+    cluster_id: Optional[str] = None
     vendor: Optional[str] = None
     cloud: Optional[str] = None
     version: Optional[str] = None
     cpu_cores: Optional[int] = 0
     memory_gb: Optional[int] = 0
     node_count: Optional[int] = 0
-    
-    class Config:
-        populate_by_name = True
 
 
-class MetricsData(BaseModel):
-    infra_envs: List[InfraEnv] = []
-    cluster_deployments: List[ClusterDeployment] = []
-    managed_clusters: List[ManagedCluster] = []
-    collection_timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+@dataclass(slots=True)
+class MetricsData:
+    infra_envs: List[InfraEnv] = field(default_factory=list)
+    cluster_deployments: List[ClusterDeployment] = field(default_factory=list)
+    managed_clusters: List[ManagedCluster] = field(default_factory=list)
+    # Unix time; convert with datetime.fromtimestamp() if a readable form is needed
+    collection_timestamp: float = field(default_factory=time.time)
\ No newline at end of file
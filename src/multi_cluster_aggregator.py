@@ -1,17 +1,37 @@
 import os
+import base64
+import gzip
 import yaml
 import aiohttp
 import asyncio
 import logging
+import re
+import ssl
 import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
-import re
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONCURRENT_CLUSTERS = 16
+
+# Resolved cluster tokens are reused for this long. Projected service account
+# tokens rotate, so they are re-read periodically rather than cached forever.
+TOKEN_CACHE_TTL_SECONDS = 600
+TOKEN_CACHE_MAX_ENTRIES = 256
+
+# Cluster payloads are streamed and rewritten as raw UTF-8 bytes
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# Sample lines with a non-empty label block, and sample lines with no or empty labels
+_LABELED_SAMPLE_RE = re.compile(rb'^([a-zA-Z_:][a-zA-Z0-9_:]*)\{(?!\})', re.MULTILINE)
+_UNLABELED_SAMPLE_RE = re.compile(rb'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{\})?(?=[ \t])', re.MULTILINE)
+
+# HELP and TYPE comment lines, including their line break
+_HEADER_LINE_RE = re.compile(rb'^# (HELP|TYPE) (\S+).*(?:\n|$)', re.MULTILINE)
+
 
 class ClusterConfig:
     """Configuration for a single MCE cluster."""
@@ -26,15 +46,34 @@ class ClusterConfig:
         self.last_success = None
         self.last_failure = None
         self.failure_count = 0
+        
+        # re.sub replacement templates for the source_cluster label, built once
+        # since the name never changes for the life of the config
+        label = f'source_cluster="{name}"'.replace('\\', '\\\\')
+        self.labeled_sample_repl = f'\\g<1>{{{label},'.encode('utf-8')
+        self.unlabeled_sample_repl = f'\\g<1>{{{label}}}'.encode('utf-8')
 
 
 class MultiClusterMetricsAggregator:
-    def __init__(self):
-        """Initialize the multi-cluster metrics aggregator."""
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None):
+        """Initialize the multi-cluster metrics aggregator.
+        
+        Args:
+            semaphore: Bounds how many clusters are fetched at the same time
+        """
         self.clusters: Dict[str, ClusterConfig] = {}
-        self.aggregated_metrics = ""
+        self.semaphore = semaphore or asyncio.Semaphore(DEFAULT_MAX_CONCURRENT_CLUSTERS)
+        self.aggregated_metrics = bytearray()
+        self.aggregated_metrics_gzip = gzip.compress(b"")
         self.cluster_status = {}
         
+        # Whether to add a source_cluster label to every fetched sample. Disable
+        # when Prometheus already attaches it through relabelling.
+        self.inject_source_cluster = os.environ.get('AGGREGATOR_INJECT_LABEL', 'true').lower() == 'true'
+        
+        # Resolved tokens keyed by "namespace/service_account", with their expiry
+        self._token_cache: Dict[str, Tuple[str, float]] = {}
+        
         # Load Kubernetes config
         try:
             config.load_incluster_config()
@@ -49,8 +88,38 @@ class MultiClusterMetricsAggregator:
         # Load cluster configuration
         self._load_cluster_config()
         
-        # Create async http session
-        self.session = None
+        # Async http session, created by start()
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+    async def start(self):
+        """Create the HTTP session shared by all cluster fetches."""
+        # Nothing is awaited before the assignment, so concurrent callers cannot race here
+        if self.session is not None:
+            return
+            
+        # Keep connections alive between aggregation runs to avoid new TLS handshakes
+        timeout = aiohttp.ClientTimeout(total=30)
+        connector = aiohttp.TCPConnector(
+            ssl=self._build_ssl_context(),
+            limit=0,
+            limit_per_host=8,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            timeout=timeout,
+            connector=connector
+        )
+        
+    def _build_ssl_context(self):
+        """Build the TLS settings shared by every cluster connection."""
+        # Routes commonly use self-signed certs, so verification is opt-in
+        if os.environ.get('AGGREGATOR_VERIFY_TLS', 'false').lower() != 'true':
+            return False
+            
+        # Built once and shared, so the CA bundle is only loaded a single time
+        ca_file = os.environ.get('AGGREGATOR_CA_FILE')
+        return ssl.create_default_context(cafile=ca_file)
         
     def _load_cluster_config(self):
         """Load cluster configuration from ConfigMap or environment."""
@@ -67,6 +136,19 @@ class MultiClusterMetricsAggregator:
             logger.info("Loading cluster config from environment variables")
             self._load_from_env()
             
+        self._build_static_header()
+        
+    def _build_static_header(self):
+        """Pre-encode the aggregator's own metric headers, which only change with the cluster config."""
+        self._static_header_bytes = (
+            "# HELP mce_aggregator_info Multi-cluster MCE metrics aggregator info\n"
+            "# TYPE mce_aggregator_info gauge\n"
+            f'mce_aggregator_info{{version="2.0.0",clusters="{len(self.clusters)}"}} 1\n'
+            "\n"
+            "# HELP mce_aggregator_cluster_up Whether the cluster metrics are being collected successfully\n"
+            "# TYPE mce_aggregator_cluster_up gauge\n"
+        ).encode('utf-8')
+        
     def _parse_cluster_config(self, config_data: dict):
         """Parse cluster configuration from dict."""
         for cluster in config_data.get('clusters', []):
@@ -117,6 +199,26 @@ class MultiClusterMetricsAggregator:
         if cluster.token:
             return cluster.token
             
+        # Reuse a recently resolved token instead of reading the secret on every fetch
+        cache_key = f"{cluster.namespace}/{cluster.service_account}"
+        cached = self._token_cache.get(cache_key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+            
+        # The Kubernetes client is blocking, so keep the secret read off the event loop
+        token, from_secret = await asyncio.to_thread(self._read_cluster_token, cluster)
+        # Only a token read from the secret is cached; the pod's own token or an empty
+        # one is a fallback after an error, so the next fetch tries the secret again
+        if from_secret:
+            self._cache_token(cache_key, token)
+        return token
+        
+    def _read_cluster_token(self, cluster: ClusterConfig) -> Tuple[str, bool]:
+        """Read the authentication token for a cluster from Kubernetes.
+        
+        Returns:
+            The token, and whether it was read from the cluster's service account secret
+        """
         # Try to get token from service account secret
         try:
             # Look for service account token secret
@@ -128,8 +230,7 @@ class MultiClusterMetricsAggregator:
             
             token = secret.data.get('token')
             if token:
-                import base64
-                return base64.b64decode(token).decode('utf-8')
+                return base64.b64decode(token).decode('utf-8'), True
                 
         except ApiException as e:
             logger.warning(f"Could not get token from secret for {cluster.name}: {e}")
@@ -139,13 +240,26 @@ class MultiClusterMetricsAggregator:
             token_file = '/var/run/secrets/kubernetes.io/serviceaccount/token'
             if os.path.exists(token_file):
                 with open(token_file, 'r') as f:
-                    return f.read()
+                    return f.read(), False
                     
-        return ""
+        return "", False
+        
+    def _cache_token(self, cache_key: str, token: str):
+        """Cache a resolved token for TOKEN_CACHE_TTL_SECONDS."""
+        # Drop the oldest entry once the cache is full
+        self._token_cache.pop(cache_key, None)
+        if len(self._token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+            self._token_cache.pop(next(iter(self._token_cache)))
+        self._token_cache[cache_key] = (token, time.monotonic() + TOKEN_CACHE_TTL_SECONDS)
         
-    async def _fetch_cluster_metrics(self, cluster: ClusterConfig) -> Tuple[str, bool]:
-        """Fetch metrics from a single cluster."""
-        start_time = time.time()
+    async def _fetch_cluster_metrics(self, cluster: ClusterConfig, attempt_time: datetime) -> Tuple[bytes, bool]:
+        """Fetch metrics from a single cluster.
+        
+        Args:
+            cluster: Cluster to fetch from
+            attempt_time: Start of the aggregation run, recorded as the success or failure time
+        """
+        start_time = time.monotonic()
         
         try:
             # Get authentication token
@@ -155,131 +269,155 @@ class MultiClusterMetricsAggregator:
             if token:
                 headers['Authorization'] = f'Bearer {token}'
                 
-            # Create session if not exists
-            if not self.session:
-                timeout = aiohttp.ClientTimeout(total=30)
-                connector = aiohttp.TCPConnector(ssl=False)  # For self-signed certs
-                self.session = aiohttp.ClientSession(
-                    timeout=timeout,
-                    connector=connector
-                )
-                
             async with self.session.get(cluster.route_url, headers=headers) as response:
                 if response.status == 200:
-                    metrics_text = await response.text()
-                    
-                    # Process metrics to add cluster label
-                    processed_metrics = self._add_cluster_label(metrics_text, cluster.name)
+                    processed_metrics = await self._read_cluster_metrics(response, cluster)
                     
                     # Update status
-                    cluster.last_success = datetime.now()
+                    cluster.last_success = attempt_time
                     cluster.failure_count = 0
                     
-                    duration = time.time() - start_time
+                    duration = time.monotonic() - start_time
                     logger.info(f"Successfully fetched metrics from {cluster.name} in {duration:.2f}s")
                     
                     return processed_metrics, True
                 else:
                     error_msg = f"HTTP {response.status}: {await response.text()}"
                     logger.error(f"Failed to fetch metrics from {cluster.name}: {error_msg}")
-                    cluster.last_failure = datetime.now()
+                    cluster.last_failure = attempt_time
                     cluster.failure_count += 1
-                    return f"# Error fetching from {cluster.name}: {error_msg}\n", False
+                    return f"# Error fetching from {cluster.name}: {error_msg}\n".encode('utf-8'), False
                     
         except asyncio.TimeoutError:
             logger.error(f"Timeout fetching metrics from {cluster.name}")
-            cluster.last_failure = datetime.now()
+            cluster.last_failure = attempt_time
             cluster.failure_count += 1
-            return f"# Error fetching from {cluster.name}: Timeout\n", False
+            return f"# Error fetching from {cluster.name}: Timeout\n".encode('utf-8'), False
         except Exception as e:
             logger.error(f"Error fetching metrics from {cluster.name}: {e}")
-            cluster.last_failure = datetime.now()
+            cluster.last_failure = attempt_time
             cluster.failure_count += 1
-            return f"# Error fetching from {cluster.name}: {str(e)}\n", False
+            return f"# Error fetching from {cluster.name}: {str(e)}\n".encode('utf-8'), False
+            
+    async def _fetch_cluster_metrics_limited(self, cluster: ClusterConfig, attempt_time: datetime) -> Tuple[bytes, bool]:
+        """Fetch metrics from a single cluster, waiting for a free concurrency slot."""
+        async with self.semaphore:
+            return await self._fetch_cluster_metrics(cluster, attempt_time)
             
-    def _add_cluster_label(self, metrics_text: str, cluster_name: str) -> str:
+    async def _read_cluster_metrics(self, response: aiohttp.ClientResponse, cluster: ClusterConfig) -> bytes:
+        """Stream a cluster's metrics body, adding the cluster label as complete lines arrive.
+        
+        Args:
+            response: Successful response from the cluster's metrics route
+            cluster: Cluster the response came from
+        """
+        metrics = bytearray()
+        if not self.inject_source_cluster:
+            async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+                metrics.extend(chunk)
+            return bytes(metrics)
+            
+        # A chunk can end mid-line, so hold back the partial line until the next one
+        pending = b""
+        async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+            chunk = pending + chunk
+            end = chunk.rfind(b"\n") + 1
+            metrics.extend(self._add_cluster_label(chunk[:end], cluster))
+            pending = chunk[end:]
+        if pending:
+            metrics.extend(self._add_cluster_label(pending, cluster))
+        return bytes(metrics)
+        
+    def _add_cluster_label(self, metrics_text: bytes, cluster: ClusterConfig) -> bytes:
         """Add source_cluster label to all metrics."""
-        lines = metrics_text.split('\n')
-        processed_lines = []
-        
-        for line in lines:
-            # Skip empty lines and comments
-            if not line or line.startswith('#'):
-                processed_lines.append(line)
-                continue
-                
-            # Parse metric line
-            match = re.match(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)\s*({[^}]*})?\s*(.+)$', line)
-            if match:
-                metric_name = match.group(1)
-                labels = match.group(2) or '{}'
-                value = match.group(3)
-                
-                # Add source_cluster label
-                if labels == '{}':
-                    new_labels = f'{{source_cluster="{cluster_name}"}}'
-                else:
-                    # Insert source_cluster at the beginning of labels
-                    new_labels = labels[:-1] + f',source_cluster="{cluster_name}"}}'
-                    new_labels = new_labels.replace('{,', '{')  # Fix if labels was empty
-                    
-                processed_lines.append(f"{metric_name}{new_labels} {value}")
-            else:
-                processed_lines.append(line)
-                
-        return '\n'.join(processed_lines)
+        # Two C-level passes over the whole payload instead of a Python loop per line.
+        # Labeled samples first, so the second pass only sees the unlabeled ones.
+        metrics_text = _LABELED_SAMPLE_RE.sub(cluster.labeled_sample_repl, metrics_text)
+        return _UNLABELED_SAMPLE_RE.sub(cluster.unlabeled_sample_repl, metrics_text)
+        
+    def _drop_seen_headers(self, metrics_text: bytes, seen_headers: set) -> bytes:
+        """Remove HELP/TYPE lines for metric families whose header was already emitted.
+        
+        Args:
+            metrics_text: Metrics text of one cluster
+            seen_headers: (kind, family) pairs already emitted, updated in place
+        """
+        def keep_first(match):
+            key = (match.group(1), match.group(2))
+            if key in seen_headers:
+                return b''
+            seen_headers.add(key)
+            return match.group(0)
+            
+        return _HEADER_LINE_RE.sub(keep_first, metrics_text)
         
     async def aggregate_all_metrics(self):
         """Aggregate metrics from all configured clusters."""
         logger.info(f"Starting aggregation for {len(self.clusters)} clusters")
         
-        # Fetch metrics from all clusters concurrently
-        tasks = []
-        for cluster_name, cluster_config in self.clusters.items():
-            task = self._fetch_cluster_metrics(cluster_config)
-            tasks.append((cluster_name, task))
-            
-        # Wait for all fetches to complete
+        # One timestamp for the whole run instead of one per cluster
+        attempt_time = datetime.now()
+        last_attempt = attempt_time.isoformat()
+        
+        # Fetch metrics from all clusters concurrently, bounded by the semaphore
+        cluster_names = list(self.clusters.keys())
+        fetch_results = await asyncio.gather(
+            *(self._fetch_cluster_metrics_limited(self.clusters[name], attempt_time) for name in cluster_names),
+            return_exceptions=True
+        )
+        
+        # Collect results, treating unexpected exceptions as failed fetches
         results = []
-        for cluster_name, task in tasks:
-            metrics, success = await task
+        for cluster_name, result in zip(cluster_names, fetch_results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error fetching metrics from {cluster_name}: {result}")
+                metrics, success = f"# Error fetching from {cluster_name}: {str(result)}\n".encode('utf-8'), False
+            else:
+                metrics, success = result
             results.append((cluster_name, metrics, success))
             self.cluster_status[cluster_name] = {
                 'success': success,
-                'last_attempt': datetime.now().isoformat(),
+                'last_attempt': last_attempt,
                 'failure_count': self.clusters[cluster_name].failure_count
             }
             
-        # Combine all metrics
-        combined_metrics = []
+        # Combine all metrics into a single UTF-8 buffer
+        buf = bytearray()
         
-        # Add aggregator metadata
-        combined_metrics.append("# HELP mce_aggregator_info Multi-cluster MCE metrics aggregator info")
-        combined_metrics.append("# TYPE mce_aggregator_info gauge")
-        combined_metrics.append(f'mce_aggregator_info{{version="2.0.0",clusters="{len(self.clusters)}"}} 1')
-        combined_metrics.append("")
+        def write_line(text: str = ""):
+            buf.extend(text.encode('utf-8'))
+            buf.append(0x0A)
+        
+        # Add aggregator metadata and the cluster status header
+        buf.extend(self._static_header_bytes)
         
         # Add cluster status metrics
-        combined_metrics.append("# HELP mce_aggregator_cluster_up Whether the cluster metrics are being collected successfully")
-        combined_metrics.append("# TYPE mce_aggregator_cluster_up gauge")
-        for cluster_name, (_, _, success) in zip(self.clusters.keys(), results):
+        for cluster_name, _, success in results:
             status = 1 if success else 0
-            combined_metrics.append(f'mce_aggregator_cluster_up{{cluster="{cluster_name}"}} {status}')
-        combined_metrics.append("")
+            write_line(f'mce_aggregator_cluster_up{{cluster="{cluster_name}"}} {status}')
+        write_line()
         
-        # Add all cluster metrics
+        # Add all cluster metrics, keeping only the first HELP/TYPE of each family
+        seen_headers = set()
         for cluster_name, metrics, success in results:
             if success and metrics:
-                combined_metrics.append(f"# Metrics from cluster: {cluster_name}")
-                combined_metrics.append(metrics)
-                combined_metrics.append("")
+                write_line(f"# Metrics from cluster: {cluster_name}")
+                buf.extend(self._drop_seen_headers(metrics, seen_headers))
+                write_line()
+                write_line()
                 
-        self.aggregated_metrics = '\n'.join(combined_metrics)
+        self.aggregated_metrics = buf
+        # Compress once per aggregation; level 1 keeps the CPU cost low
+        self.aggregated_metrics_gzip = gzip.compress(buf, compresslevel=1)
         logger.info("Aggregation completed")
         
-    def get_aggregated_metrics(self) -> str:
+    def get_aggregated_metrics(self) -> bytes:
         """Get the latest aggregated metrics."""
-        return self.aggregated_metrics
+        return bytes(self.aggregated_metrics)
+        
+    def get_aggregated_metrics_gzip(self) -> bytes:
+        """Get the latest aggregated metrics, gzip-compressed."""
+        return self.aggregated_metrics_gzip
         
     def get_cluster_status(self) -> dict:
         """Get status of all monitored clusters."""
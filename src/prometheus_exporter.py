@@ -1,14 +1,176 @@
 import os
 import time
+import asyncio
 import logging
-from prometheus_client import Gauge, Counter, Info, generate_latest, REGISTRY
-from prometheus_client.core import CollectorRegistry
-from typing import Dict, Any
+import collections
+import operator
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from prometheus_client import Gauge, Counter, generate_latest, REGISTRY
+from prometheus_client.core import CollectorRegistry, GaugeMetricFamily
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
 from models import MetricsData, HostStatus
 from collector import OpenShiftMetricsCollector
 
 logger = logging.getLogger(__name__)
 
+HOST_LABELS = ['cluster_name', 'host_id', 'hostname', 'infraenv', 'namespace']
+MANAGED_CLUSTER_LABELS = ['cluster_name', 'name', 'cluster_id']
+
+# Enum .value goes through a descriptor on every access, a dict lookup does not
+_STATUS_VALUES = {status: status.value for status in HostStatus}
+
+# Statuses in which a host counts as available
+_AVAILABLE_STATUSES = frozenset({HostStatus.KNOWN, HostStatus.PREPARING_SUCCESSFUL})
+
+# Host fields the per-InfraEnv stats are computed from
+_HOST_SIGNATURE = operator.attrgetter('status', 'cpu_cores', 'memory_mb')
+
+
+class SnapshotCollector(ABC):
+    """Registry collector that builds its metric families from the latest collection."""
+    def __init__(self, cluster_name: str):
+        """Initialize the collector.
+        
+        Args:
+            cluster_name: Value of the cluster_name label on every series
+        """
+        self.cluster_name = cluster_name
+        self.metrics_data: Optional[MetricsData] = None
+        # Families built from a collection, paired with the collection they came from
+        self._families: Optional[Tuple[Optional[MetricsData], Tuple[GaugeMetricFamily, ...]]] = None
+    
+    def update(self, metrics_data: MetricsData):
+        """Replace the collection the families are built from."""
+        self.metrics_data = metrics_data
+    
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """Yield the metric families of the latest collection."""
+        # Every encoder (text, OpenMetrics) and every unchanged collection reuses
+        # the same frozen families until a new collection arrives
+        metrics_data = self.metrics_data
+        cached = self._families
+        if cached is None or cached[0] is not metrics_data:
+            cached = self._families = (metrics_data, self._build_families(metrics_data))
+        yield from cached[1]
+    
+    @abstractmethod
+    def _build_families(self, metrics_data: Optional[MetricsData]) -> Tuple[GaugeMetricFamily, ...]:
+        """Build the metric families from a collection."""
+
+
+class HostMetricsCollector(SnapshotCollector):
+    """Builds the per-host metric families."""
+    def _build_families(self, metrics_data: Optional[MetricsData]) -> Tuple[GaugeMetricFamily, ...]:
+        """Build the per-host metric families from a collection."""
+        host_status = GaugeMetricFamily(
+            'openshift_mce_host_status',
+            'Host status (1 for the current status of the host)',
+            labels=HOST_LABELS + ['status']
+        )
+        host_cpu_cores = GaugeMetricFamily(
+            'openshift_mce_host_cpu_cores',
+            'Number of CPU cores on host',
+            labels=HOST_LABELS
+        )
+        host_memory_mb = GaugeMetricFamily(
+            'openshift_mce_host_memory_mb',
+            'Memory in MB on host',
+            labels=HOST_LABELS
+        )
+        host_disk_gb = GaugeMetricFamily(
+            'openshift_mce_host_disk_gb',
+            'Disk space in GB on host',
+            labels=HOST_LABELS
+        )
+        
+        # Rebuilt from scratch for every collection, so hosts that are gone leave no stale series
+        if metrics_data:
+            # Bind the hot methods once rather than looking them up per host
+            add_status = host_status.add_metric
+            add_cpu_cores = host_cpu_cores.add_metric
+            add_memory_mb = host_memory_mb.add_metric
+            add_disk_gb = host_disk_gb.add_metric
+            cluster_name = self.cluster_name
+            status_values = _STATUS_VALUES
+            
+            for infra_env in metrics_data.infra_envs:
+                infraenv_name = infra_env.name
+                namespace = infra_env.namespace
+                for host in infra_env.hosts:
+                    labels = [cluster_name, host.id, host.hostname or 'unknown', infraenv_name, namespace]
+                    add_status(labels + [status_values[host.status]], 1)
+                    if host.cpu_cores:
+                        add_cpu_cores(labels, host.cpu_cores)
+                    if host.memory_mb:
+                        add_memory_mb(labels, host.memory_mb)
+                    if host.disk_gb:
+                        add_disk_gb(labels, host.disk_gb)
+        
+        return host_status, host_cpu_cores, host_memory_mb, host_disk_gb
+
+
+class ClusterMetricsCollector(SnapshotCollector):
+    """Builds the per-ClusterDeployment and per-ManagedCluster metric families."""
+    def _build_families(self, metrics_data: Optional[MetricsData]) -> Tuple[GaugeMetricFamily, ...]:
+        """Build the ClusterDeployment and ManagedCluster metric families from a collection."""
+        cluster_deployment_status = GaugeMetricFamily(
+            'openshift_mce_cluster_deployment_status',
+            'ClusterDeployment status',
+            labels=['cluster_name', 'name', 'namespace', 'status']
+        )
+        managed_cluster_info = GaugeMetricFamily(
+            'openshift_mce_managed_cluster_info',
+            'ManagedCluster information',
+            labels=MANAGED_CLUSTER_LABELS + ['vendor', 'cloud', 'version']
+        )
+        managed_cluster_cpu_cores = GaugeMetricFamily(
+            'openshift_mce_managed_cluster_cpu_cores',
+            'CPU cores in managed cluster',
+            labels=MANAGED_CLUSTER_LABELS
+        )
+        managed_cluster_memory_gb = GaugeMetricFamily(
+            'openshift_mce_managed_cluster_memory_gb',
+            'Memory in GB in managed cluster',
+            labels=MANAGED_CLUSTER_LABELS
+        )
+        managed_cluster_node_count = GaugeMetricFamily(
+            'openshift_mce_managed_cluster_node_count',
+            'Number of nodes in managed cluster',
+            labels=MANAGED_CLUSTER_LABELS
+        )
+        
+        if metrics_data:
+            cluster_name = self.cluster_name
+            
+            for cd in metrics_data.cluster_deployments:
+                if cd.status:
+                    cluster_deployment_status.add_metric([cluster_name, cd.name, cd.namespace, cd.status], 1)
+            
+            for mc in metrics_data.managed_clusters:
+                # Label values shared by every per-ManagedCluster series, in label order
+                mc_labels = [cluster_name, mc.name, mc.cluster_id or 'unknown']
+                
+                managed_cluster_info.add_metric(
+                    mc_labels + [mc.vendor or 'unknown', mc.cloud or 'unknown', mc.version or 'unknown'],
+                    1
+                )
+                if mc.cpu_cores:
+                    managed_cluster_cpu_cores.add_metric(mc_labels, mc.cpu_cores)
+                if mc.memory_gb:
+                    managed_cluster_memory_gb.add_metric(mc_labels, mc.memory_gb)
+                if mc.node_count:
+                    managed_cluster_node_count.add_metric(mc_labels, mc.node_count)
+        
+        return (
+            cluster_deployment_status,
+            managed_cluster_info,
+            managed_cluster_cpu_cores,
+            managed_cluster_memory_gb,
+            managed_cluster_node_count
+        )
+
 
 class PrometheusMetricsExporter:
     def __init__(self, collector: OpenShiftMetricsCollector):
@@ -16,6 +178,10 @@ class PrometheusMetricsExporter:
         self.registry = CollectorRegistry()
         # Get cluster name from environment variable or use default
         self.cluster_name = os.environ.get('CLUSTER_NAME', 'default-cluster')
+        # Held while the registry is updated or rendered, so a render never sees a half-applied collection
+        self._registry_lock = threading.Lock()
+        # Host signature and derived stats of each InfraEnv, keyed by its label values
+        self._infraenv_states: Dict[tuple, tuple] = {}
         self._setup_metrics()
         
     def _setup_metrics(self):
@@ -64,34 +230,9 @@ class PrometheusMetricsExporter:
             registry=self.registry
         )
         
-        # Host metrics
-        self.host_status = Gauge(
-            'openshift_mce_host_status',
-            'Host status (1 if in this status, 0 otherwise)',
-            ['cluster_name', 'host_id', 'hostname', 'infraenv', 'namespace', 'status'],
-            registry=self.registry
-        )
-        
-        self.host_cpu_cores = Gauge(
-            'openshift_mce_host_cpu_cores',
-            'Number of CPU cores on host',
-            ['cluster_name', 'host_id', 'hostname', 'infraenv', 'namespace'],
-            registry=self.registry
-        )
-        
-        self.host_memory_mb = Gauge(
-            'openshift_mce_host_memory_mb',
-            'Memory in MB on host',
-            ['cluster_name', 'host_id', 'hostname', 'infraenv', 'namespace'],
-            registry=self.registry
-        )
-        
-        self.host_disk_gb = Gauge(
-            'openshift_mce_host_disk_gb',
-            'Disk space in GB on host',
-            ['cluster_name', 'host_id', 'hostname', 'infraenv', 'namespace'],
-            registry=self.registry
-        )
+        # Host metrics are built per scrape by a custom collector
+        self.host_metrics = HostMetricsCollector(self.cluster_name)
+        self.registry.register(self.host_metrics)
         
         # Aggregate metrics
         self.total_hosts = Gauge(
@@ -137,13 +278,6 @@ class PrometheusMetricsExporter:
             registry=self.registry
         )
         
-        self.cluster_deployment_status = Gauge(
-            'openshift_mce_cluster_deployment_status',
-            'ClusterDeployment status',
-            ['cluster_name', 'name', 'namespace', 'status'],
-            registry=self.registry
-        )
-        
         # ManagedCluster metrics
         self.managed_cluster_count = Gauge(
             'openshift_mce_managed_cluster_count',
@@ -152,33 +286,10 @@ class PrometheusMetricsExporter:
             registry=self.registry
         )
         
-        self.managed_cluster_info = Info(
-            'openshift_mce_managed_cluster',
-            'ManagedCluster information',
-            ['cluster_name', 'name', 'cluster_id'],
-            registry=self.registry
-        )
-        
-        self.managed_cluster_cpu_cores = Gauge(
-            'openshift_mce_managed_cluster_cpu_cores',
-            'CPU cores in managed cluster',
-            ['cluster_name', 'name', 'cluster_id'],
-            registry=self.registry
-        )
-        
-        self.managed_cluster_memory_gb = Gauge(
-            'openshift_mce_managed_cluster_memory_gb',
-            'Memory in GB in managed cluster',
-            ['cluster_name', 'name', 'cluster_id'],
-            registry=self.registry
-        )
-        
-        self.managed_cluster_node_count = Gauge(
-            'openshift_mce_managed_cluster_node_count',
-            'Number of nodes in managed cluster',
-            ['cluster_name', 'name', 'cluster_id'],
-            registry=self.registry
-        )
+        # Per-ClusterDeployment and per-ManagedCluster series are built per collection
+        # by a custom collector, like the per-host ones
+        self.cluster_metrics = ClusterMetricsCollector(self.cluster_name)
+        self.registry.register(self.cluster_metrics)
         
         # Collection metrics
         self.collection_duration_seconds = Gauge(
@@ -194,192 +305,133 @@ class PrometheusMetricsExporter:
             ['cluster_name'],
             registry=self.registry
         )
+        
+        # Series labelled only by this exporter's cluster_name always exist, so
+        # resolve their children once instead of on every update
+        self._set_infraenv_count = self.infraenv_count.labels(self.cluster_name).set
+        self._set_total_hosts = self.total_hosts.labels(self.cluster_name).set
+        self._set_total_available_hosts = self.total_available_hosts.labels(self.cluster_name).set
+        self._set_total_cpu_cores = self.total_cpu_cores.labels(self.cluster_name).set
+        self._set_total_memory_gb = self.total_memory_gb.labels(self.cluster_name).set
+        self._set_total_hosts_by_status = {
+            status: self.total_hosts_by_status.labels(self.cluster_name, status_value).set
+            for status, status_value in _STATUS_VALUES.items()
+        }
+        self._set_cluster_deployment_count = self.cluster_deployment_count.labels(self.cluster_name).set
+        self._set_managed_cluster_count = self.managed_cluster_count.labels(self.cluster_name).set
+        self._set_collection_duration = self.collection_duration_seconds.labels(self.cluster_name).set
+        self._inc_collection_errors = self.collection_errors.labels(self.cluster_name).inc
     
     def update_metrics(self, metrics_data: MetricsData):
         """Update Prometheus metrics with collected data."""
-        # Reset metrics to avoid stale data
-        self._reset_metrics()
+        # Per-object series come from snapshot collectors rebuilt per collection, and
+        # per-InfraEnv series of removed InfraEnvs are dropped below, so nothing here
+        # can go stale
         
         # Update InfraEnv metrics
-        self.infraenv_count.labels(cluster_name=self.cluster_name).set(len(metrics_data.infra_envs))
+        self._set_infraenv_count(len(metrics_data.infra_envs))
         
         # Global counters
         total_hosts = 0
         total_available = 0
         total_cpu = 0
         total_memory_mb = 0
-        global_status_counts = {status: 0 for status in HostStatus}
+        global_status_counts = collections.Counter()
+        
+        infraenv_states = {}
         
         for infra_env in metrics_data.infra_envs:
-            # Per-InfraEnv counters
-            infraenv_total_hosts = len(infra_env.hosts)
-            infraenv_available = 0
-            infraenv_cpu = 0
-            infraenv_memory_mb = 0
-            infraenv_status_counts = {status: 0 for status in HostStatus}
+            hosts = infra_env.hosts
             
-            # InfraEnv host count
-            self.infraenv_hosts.labels(
-                cluster_name=self.cluster_name,
-                infraenv_name=infra_env.name,
-                namespace=infra_env.namespace
-            ).set(infraenv_total_hosts)
+            # Label values shared by every per-InfraEnv series, in label order
+            infraenv_labels = (self.cluster_name, infra_env.name, infra_env.namespace)
             
-            # Process each host
-            for host in infra_env.hosts:
-                total_hosts += 1
-                
-                # Count by status
-                infraenv_status_counts[host.status] += 1
-                global_status_counts[host.status] += 1
-                
-                # Host status
-                for status in HostStatus:
-                    is_current_status = 1 if host.status == status else 0
-                    self.host_status.labels(
-                        cluster_name=self.cluster_name,
-                        host_id=host.id,
-                        hostname=host.hostname or 'unknown',
-                        infraenv=infra_env.name,
-                        namespace=infra_env.namespace,
-                        status=status.value
-                    ).set(is_current_status)
-                
-                # Check if host is available
-                if host.status in [HostStatus.KNOWN, HostStatus.PREPARING_SUCCESSFUL]:
-                    infraenv_available += 1
-                    total_available += 1
-                
-                # Host resources
-                if host.cpu_cores:
-                    self.host_cpu_cores.labels(
-                        cluster_name=self.cluster_name,
-                        host_id=host.id,
-                        hostname=host.hostname or 'unknown',
-                        infraenv=infra_env.name,
-                        namespace=infra_env.namespace
-                    ).set(host.cpu_cores)
-                    infraenv_cpu += host.cpu_cores
-                    total_cpu += host.cpu_cores
-                
-                if host.memory_mb:
-                    self.host_memory_mb.labels(
-                        cluster_name=self.cluster_name,
-                        host_id=host.id,
-                        hostname=host.hostname or 'unknown',
-                        infraenv=infra_env.name,
-                        namespace=infra_env.namespace
-                    ).set(host.memory_mb)
-                    infraenv_memory_mb += host.memory_mb
-                    total_memory_mb += host.memory_mb
-                
-                if host.disk_gb:
-                    self.host_disk_gb.labels(
-                        cluster_name=self.cluster_name,
-                        host_id=host.id,
-                        hostname=host.hostname or 'unknown',
-                        infraenv=infra_env.name,
-                        namespace=infra_env.namespace
-                    ).set(host.disk_gb)
-            
-            # Set per-InfraEnv metrics
-            self.infraenv_available_hosts.labels(
-                cluster_name=self.cluster_name,
-                infraenv_name=infra_env.name,
-                namespace=infra_env.namespace
-            ).set(infraenv_available)
-            
-            # Set per-InfraEnv status counts
-            for status, count in infraenv_status_counts.items():
-                self.infraenv_hosts_by_status.labels(
-                    cluster_name=self.cluster_name,
-                    infraenv_name=infra_env.name,
-                    namespace=infra_env.namespace,
-                    status=status.value
-                ).set(count)
-            
-            self.infraenv_cpu_cores.labels(
-                cluster_name=self.cluster_name,
-                infraenv_name=infra_env.name,
-                namespace=infra_env.namespace
-            ).set(infraenv_cpu)
+            # Reuse the previous stats, and leave the series alone, when no host changed
+            signature = tuple(map(_HOST_SIGNATURE, hosts))
+            previous = self._infraenv_states.get(infraenv_labels)
+            if previous and previous[0] == signature:
+                _, infraenv_status_counts, infraenv_cpu, infraenv_memory_mb = previous
+            else:
+                # Per-InfraEnv counters, each reduced in a single pass over the hosts.
+                # Summing a list comprehension beats both a filtered generator and
+                # filter(None, map(attrgetter(...))) on slotted dataclasses.
+                infraenv_status_counts = collections.Counter(host.status for host in hosts)
+                infraenv_cpu = sum([host.cpu_cores or 0 for host in hosts])
+                infraenv_memory_mb = sum([host.memory_mb or 0 for host in hosts])
+                self._set_infraenv_metrics(
+                    infraenv_labels, len(hosts), infraenv_status_counts, infraenv_cpu, infraenv_memory_mb
+                )
+            infraenv_states[infraenv_labels] = (
+                signature, infraenv_status_counts, infraenv_cpu, infraenv_memory_mb
+            )
             
-            self.infraenv_memory_gb.labels(
-                cluster_name=self.cluster_name,
-                infraenv_name=infra_env.name,
-                namespace=infra_env.namespace
-            ).set(infraenv_memory_mb / 1024 if infraenv_memory_mb > 0 else 0)
+            # Fold this InfraEnv into the global totals
+            total_hosts += len(hosts)
+            total_available += sum(infraenv_status_counts[status] for status in _AVAILABLE_STATUSES)
+            total_cpu += infraenv_cpu
+            total_memory_mb += infraenv_memory_mb
+            global_status_counts.update(infraenv_status_counts)
+        
+        # Drop the series of InfraEnvs that are gone
+        for infraenv_labels in self._infraenv_states.keys() - infraenv_states.keys():
+            self._remove_infraenv_metrics(infraenv_labels)
+        self._infraenv_states = infraenv_states
+        
+        # Per-host series are built from this collection on the next scrape
+        self.host_metrics.update(metrics_data)
         
         # Update global aggregate metrics
-        self.total_hosts.labels(cluster_name=self.cluster_name).set(total_hosts)
-        self.total_available_hosts.labels(cluster_name=self.cluster_name).set(total_available)
-        self.total_cpu_cores.labels(cluster_name=self.cluster_name).set(total_cpu)
-        self.total_memory_gb.labels(cluster_name=self.cluster_name).set(
+        self._set_total_hosts(total_hosts)
+        self._set_total_available_hosts(total_available)
+        self._set_total_cpu_cores(total_cpu)
+        self._set_total_memory_gb(
             total_memory_mb / 1024 if total_memory_mb > 0 else 0
         )
         
         # Set global status counts
-        for status, count in global_status_counts.items():
-            self.total_hosts_by_status.labels(
-                cluster_name=self.cluster_name,
-                status=status.value
-            ).set(count)
-        
-        # Update ClusterDeployment metrics
-        self.cluster_deployment_count.labels(cluster_name=self.cluster_name).set(
-            len(metrics_data.cluster_deployments)
-        )
+        for status, set_count in self._set_total_hosts_by_status.items():
+            set_count(global_status_counts[status])
+        
+        # Update ClusterDeployment and ManagedCluster metrics
+        self._set_cluster_deployment_count(len(metrics_data.cluster_deployments))
+        self._set_managed_cluster_count(len(metrics_data.managed_clusters))
         
-        for cd in metrics_data.cluster_deployments:
-            if cd.status:
-                self.cluster_deployment_status.labels(
-                    cluster_name=self.cluster_name,
-                    name=cd.name,
-                    namespace=cd.namespace,
-                    status=cd.status
-                ).set(1)
-        
-        # Update ManagedCluster metrics
-        self.managed_cluster_count.labels(cluster_name=self.cluster_name).set(
-            len(metrics_data.managed_clusters)
+        # Their per-object series are built from this collection on the next scrape
+        self.cluster_metrics.update(metrics_data)
+    
+    def _set_infraenv_metrics(self, infraenv_labels: tuple, host_count: int,
+                              status_counts: collections.Counter, cpu_cores: int, memory_mb: int):
+        """Set the per-InfraEnv series.
+        
+        Args:
+            infraenv_labels: Label values shared by the InfraEnv's series
+            host_count: Number of hosts in the InfraEnv
+            status_counts: Number of hosts per HostStatus
+            cpu_cores: Total CPU cores of the hosts
+            memory_mb: Total memory of the hosts in MB
+        """
+        self.infraenv_hosts.labels(*infraenv_labels).set(host_count)
+        
+        # Available hosts follow from the status counts
+        self.infraenv_available_hosts.labels(*infraenv_labels).set(
+            sum(status_counts[status] for status in _AVAILABLE_STATUSES)
         )
         
-        for mc in metrics_data.managed_clusters:
-            self.managed_cluster_info.labels(
-                cluster_name=self.cluster_name,
-                name=mc.name,
-                cluster_id=mc.cluster_id or 'unknown'
-            ).info({
-                'vendor': mc.vendor or 'unknown',
-                'cloud': mc.cloud or 'unknown',
-                'version': mc.version or 'unknown'
-            })
-            
-            if mc.cpu_cores:
-                self.managed_cluster_cpu_cores.labels(
-                    cluster_name=self.cluster_name,
-                    name=mc.name,
-                    cluster_id=mc.cluster_id or 'unknown'
-                ).set(mc.cpu_cores)
-            
-            if mc.memory_gb:
-                self.managed_cluster_memory_gb.labels(
-                    cluster_name=self.cluster_name,
-                    name=mc.name,
-                    cluster_id=mc.cluster_id or 'unknown'
-                ).set(mc.memory_gb)
-            
-            if mc.node_count:
-                self.managed_cluster_node_count.labels(
-                    cluster_name=self.cluster_name,
-                    name=mc.name,
-                    cluster_id=mc.cluster_id or 'unknown'
-                ).set(mc.node_count)
+        # Set per-InfraEnv status counts, reporting 0 for statuses no host is in
+        for status, status_value in _STATUS_VALUES.items():
+            self.infraenv_hosts_by_status.labels(*infraenv_labels, status_value).set(status_counts[status])
+        
+        self.infraenv_cpu_cores.labels(*infraenv_labels).set(cpu_cores)
+        self.infraenv_memory_gb.labels(*infraenv_labels).set(memory_mb / 1024 if memory_mb > 0 else 0)
     
-    def _reset_metrics(self):
-        """Reset all metrics to avoid stale data."""
-        # This is handled by Prometheus client library when setting new values
-        pass
+    def _remove_infraenv_metrics(self, infraenv_labels: tuple):
+        """Remove the per-InfraEnv series of an InfraEnv that no longer exists."""
+        self.infraenv_hosts.remove(*infraenv_labels)
+        self.infraenv_available_hosts.remove(*infraenv_labels)
+        for status_value in _STATUS_VALUES.values():
+            self.infraenv_hosts_by_status.remove(*infraenv_labels, status_value)
+        self.infraenv_cpu_cores.remove(*infraenv_labels)
+        self.infraenv_memory_gb.remove(*infraenv_labels)
     
     def collect_and_update(self):
         """Collect metrics and update Prometheus metrics."""
@@ -387,18 +439,47 @@ class PrometheusMetricsExporter:
         
         try:
             metrics_data = self.collector.collect_all_metrics()
-            self.update_metrics(metrics_data)
+            self._apply_collection(metrics_data, start_time)
             
-            duration = time.time() - start_time
-            self.collection_duration_seconds.labels(cluster_name=self.cluster_name).set(duration)
+        except Exception as e:
+            logger.error(f"Error collecting metrics: {e}")
+            self._inc_collection_errors()
+            raise
+    
+    async def collect_and_update_async(self, executor: Optional[Executor] = None):
+        """Collect metrics concurrently off the event loop and update Prometheus metrics."""
+        start_time = time.time()
+        
+        try:
+            metrics_data = await self.collector.collect_all_metrics_async(executor)
             
-            logger.info(f"Metrics updated successfully in {duration:.2f} seconds for cluster {self.cluster_name}")
+            # Updating the registry is CPU-bound too, so keep it off the loop as well
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, self._apply_collection, metrics_data, start_time)
             
         except Exception as e:
             logger.error(f"Error collecting metrics: {e}")
-            self.collection_errors.labels(cluster_name=self.cluster_name).inc()
+            self._inc_collection_errors()
             raise
     
-    def generate_metrics(self) -> bytes:
-        """Generate metrics in Prometheus format."""
-        return generate_latest(self.registry)
\ No newline at end of file
+    def _apply_collection(self, metrics_data: MetricsData, start_time: float):
+        """Update Prometheus metrics from a finished collection and record its duration."""
+        with self._registry_lock:
+            if self.collector.metrics_changed:
+                self.update_metrics(metrics_data)
+            else:
+                logger.info("Collected data unchanged since last collection, keeping current metrics")
+            
+            duration = time.time() - start_time
+            self._set_collection_duration(duration)
+        
+        logger.info(f"Metrics updated successfully in {duration:.2f} seconds for cluster {self.cluster_name}")
+    
+    def generate_metrics(self, encoder: Callable[[CollectorRegistry], bytes] = generate_latest) -> bytes:
+        """Generate metrics in Prometheus format.
+        
+        Args:
+            encoder: Exposition encoder to render the registry with, classic text by default
+        """
+        with self._registry_lock:
+            return encoder(self.registry)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before re-establishing a watch after an unexpected error,
+# doubled on every consecutive failure up to MAX_RETRY_DELAY_SECONDS
+RETRY_DELAY_SECONDS = 5
+MAX_RETRY_DELAY_SECONDS = 300
+
+# Extra seconds the client waits for a watch past its server-side timeout, so a
+# half-open connection raises instead of blocking the stream forever
+WATCH_REQUEST_TIMEOUT_MARGIN_SECONDS = 30
+
+
+def list_custom_objects(custom_api, **list_kwargs) -> Dict[str, Any]:
+    """LIST a cluster-wide custom resource, decoding the response with orjson."""
+    # Skip the client's generic deserializer; orjson is much faster on large lists
+    response = custom_api.list_cluster_custom_object(_preload_content=False, **list_kwargs)
+    try:
+        return orjson.loads(response.data)
+    finally:
+        response.release_conn()
+
+
+class ResourceCache:
+    """In-memory copy of a cluster-wide custom resource list, kept current by a watch."""
+    def __init__(self, custom_api, group: str, version: str, plural: str,
+                 label_selector: Optional[str] = None, timeout_seconds: int = 300):
+        """Initialize the cache.
+        
+        Args:
+            custom_api: CustomObjectsApi used for the LIST and WATCH calls
+            group: API group of the resource
+            version: API version of the resource
+            plural: Plural resource name
+            label_selector: Optional label selector applied server-side
+            timeout_seconds: How long a single watch stays open before it is renewed
+        """
+        self.custom_api = custom_api
+        self.plural = plural
+        self.timeout_seconds = timeout_seconds
+        self._list_kwargs = {'group': group, 'version': version, 'plural': plural}
+        if label_selector:
+            self._list_kwargs['label_selector'] = label_selector
+        
+        self._items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._resource_version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the background LIST + WATCH loop."""
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"watch-{self.plural}",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background loop."""
+        self._stopped.set()
+        if self._watch:
+            self._watch.stop()
+    
+    def has_synced(self) -> bool:
+        """Whether the cache holds a complete, current copy of the resource."""
+        return self._synced.is_set()
+    
+    def list_items(self) -> List[Dict[str, Any]]:
+        """Get a snapshot of the cached objects."""
+        with self._lock:
+            return list(self._items.values())
+    
+    @staticmethod
+    def _key(obj: Dict[str, Any]) -> Tuple[str, str]:
+        metadata = obj.get('metadata', {})
+        return metadata.get('namespace', ''), metadata.get('name', '')
+    
+    def _run(self):
+        """Keep the cache in sync with the API server until stopped."""
+        retry_delay = RETRY_DELAY_SECONDS
+        while not self._stopped.is_set():
+            try:
+                if self._resource_version is None:
+                    self._relist()
+                self._watch_once()
+                retry_delay = RETRY_DELAY_SECONDS
+                continue
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resourceVersion is too old, start over from a fresh LIST
+                    logger.info(f"Watch on {self.plural} expired, relisting")
+                    self._resource_version = None
+                    continue
+                logger.error(f"Error watching {self.plural}, retrying in {retry_delay}s: {e}")
+            except Exception as e:
+                logger.error(f"Error watching {self.plural}, retrying in {retry_delay}s: {e}", exc_info=True)
+            
+            # Keep the resourceVersion so the watch resumes where it left off instead
+            # of relisting, but stop serving the cache until it is caught up again
+            self._synced.clear()
+            self._stopped.wait(retry_delay)
+            retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY_SECONDS)
+    
+    def _relist(self):
+        """Replace the cache contents with a full LIST."""
+        result = list_custom_objects(self.custom_api, **self._list_kwargs)
+        items = {self._key(item): item for item in result.get('items', [])}
+        
+        with self._lock:
+            self._items = items
+        self._resource_version = result.get('metadata', {}).get('resourceVersion')
+        self._synced.set()
+        logger.info(f"Cached {len(items)} {self.plural} at resourceVersion {self._resource_version}")
+    
+    def _watch_once(self):
+        """Apply watch events until the server closes the stream."""
+        self._watch = watch.Watch()
+        stream = self._watch.stream(
+            self.custom_api.list_cluster_custom_object,
+            resource_version=self._resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.timeout_seconds,
+            _request_timeout=self.timeout_seconds + WATCH_REQUEST_TIMEOUT_MARGIN_SECONDS,
+            **self._list_kwargs
+        )
+        
+        for event in stream:
+            if self._stopped.is_set():
+                self._watch.stop()
+                break
+            
+            # The first event of a resumed watch replays what was missed while it
+            # was down, so the cache is current again from here on
+            if not self._synced.is_set():
+                self._synced.set()
+            
+            event_type = event['type']
+            obj = event['raw_object']
+            
+            if event_type in ('ADDED', 'MODIFIED'):
+                with self._lock:
+                    self._items[self._key(obj)] = obj
+            elif event_type == 'DELETED':
+                with self._lock:
+                    self._items.pop(self._key(obj), None)
+            
+            # Bookmarks carry only a resourceVersion, but it still moves us forward
+            self._resource_version = obj.get('metadata', {}).get('resourceVersion', self._resource_version)